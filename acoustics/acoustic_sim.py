@@ -1,24 +1,38 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.signal import find_peaks
+import pandas as pd
+import plotly.graph_objects as go
 from pydub import AudioSegment
 from pydub.generators import Sine
-import tempfile
+import io
 import os
 import logging
 import sys
 
-# Add backend to path to import gpu_compute
+# Add backend to path so this module also works when run standalone
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-try:
-    from backend.gpu import gpu_compute
-except ImportError:
-    gpu_compute = None
+from backend.physics import get_engine, fast_peaks
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Fallback profile used when the geometry section hasn't stored one yet;
+# struct-of-arrays: parallel x (mm) and r (mm) vectors
+DEFAULT_BORE_PROFILE = {
+    "x": np.array([0.0, 20.0, 40.0, 66.0]),
+    "r": np.array([15.0, 14.8, 14.8, 14.6]),
+}
+
+
+@st.cache_data
+def synth_mp3_bytes(freq_hz: int) -> bytes:
+    """Synthesizes a 1 s sine at freq_hz and returns the MP3 bytes, cached
+    so reruns with the same peak frequency skip the ffmpeg encode."""
+    seg = Sine(freq_hz).to_audio_segment(duration=1000).apply_gain(-3.0)
+    buf = io.BytesIO()
+    seg.export(buf, format="mp3")
+    return buf.getvalue()
+
 def render():
     st.subheader("Acoustic Simulation Suite")
 
@@ -35,38 +49,47 @@ def render():
     st.markdown("### Frequency Domain Analysis ℹ️")
     st.caption(tooltips["freq_analysis"])
 
-    # Simulated impedance curve
-    freqs = np.linspace(100, 2000, 800)
-
-    # Try to use GPU compute if available for impedance calculation
-    # We create a dummy bore for the GPU function (length, radius)
-    # The GPU function calculates "sum of z*r" which is just a dummy calc in this codebase
-    # but we should use it to show integration.
-    if gpu_compute:
-        # Mock bore
-        L = np.ones(100)
-        R = np.ones(100)
-        gpu_result = gpu_compute.gpu_accelerated_impedance(L, R)
-        if gpu_result is not None:
-             st.success(f"GPU Accelerated Calculation Check: {gpu_result} (dummy value)")
-
-    impedance = 1 / (np.abs(np.sin(freqs / 250)) + 0.2)
-    peaks, _ = find_peaks(impedance, distance=40)
-
-    fig, ax = plt.subplots()
-    ax.plot(freqs, impedance, label="Impedance Curve")
-    ax.plot(freqs[peaks], impedance[peaks], "x", label="Resonance Peaks")
-    ax.set_xlabel("Frequency (Hz)")
-    ax.set_ylabel("Impedance (a.u.)")
-    ax.set_title("Impedance vs Frequency")
-    ax.legend()
-    st.pyplot(fig)
+    # TMM impedance curve for the current bore profile. The result persists
+    # in session state so widget interactions elsewhere on the page replot
+    # without re-running the solver; peak positions are stored as INDICES
+    # into the freqs array (float equality lookups like np.isin are both
+    # O(N*M) and unreliable).
+    bore_profile = st.session_state.get("bore_profile", DEFAULT_BORE_PROFILE)
+    engine = get_engine(True)
+
+    if st.button("Run Impedance Simulation") or "acoustic_result" not in st.session_state:
+        freqs, impedance = engine.compute_impedance_curve(bore_profile, freq_range=(100.0, 2000.0), freq_step=2.0)
+        peaks_idx = fast_peaks(impedance, min_dist=40)
+        st.session_state.acoustic_result = {
+            "freqs": freqs,
+            "impedance": impedance,
+            "peaks_idx": peaks_idx,
+        }
+        logger.debug(f"Simulated impedance curve with {len(peaks_idx)} peaks.")
+
+    res = st.session_state.acoustic_result
+    freqs = res["freqs"]
+    impedance = res["impedance"]
+    peaks_idx = res["peaks_idx"]
+
+    # Plotly ships compact JSON to the browser instead of rasterizing a PNG
+    # server-side on every rerun like st.pyplot does.
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=freqs, y=impedance, mode="lines", name="Impedance Curve"))
+    fig.add_trace(go.Scatter(x=freqs[peaks_idx], y=impedance[peaks_idx], mode="markers",
+                             marker_symbol="x", name="Resonance Peaks"))
+    fig.update_layout(
+        title="Impedance vs Frequency",
+        xaxis_title="Frequency (Hz)",
+        yaxis_title="Impedance (a.u.)",
+        height=400
+    )
+    st.plotly_chart(fig, use_container_width=True)
     st.caption(tooltips["impedance"])
-    logger.debug(f"Simulated impedance curve with {len(peaks)} peaks.")
 
     # Display resonance frequencies
     st.markdown("**Detected Resonance Frequencies (Hz):**")
-    st.write(np.round(freqs[peaks], 1).tolist())
+    st.write(np.round(freqs[peaks_idx], 1).tolist())
     st.caption(tooltips["peaks"])
 
     # Time domain simulation
@@ -75,12 +98,8 @@ def render():
 
     time = np.linspace(0, 0.5, 500)
     attack = np.exp(-15 * time) * np.sin(2 * np.pi * 440 * time)
-    fig2, ax2 = plt.subplots()
-    ax2.plot(time, attack)
-    ax2.set_xlabel("Time (s)")
-    ax2.set_ylabel("Amplitude")
-    ax2.set_title("Note Attack Envelope")
-    st.pyplot(fig2)
+    attack_df = pd.DataFrame({"Amplitude": attack}, index=pd.Index(time, name="Time (s)"))
+    st.line_chart(attack_df)
     st.caption(tooltips["attack_env"])
     logger.debug("Displayed note attack envelope (time domain response).")
 
@@ -89,21 +108,13 @@ def render():
     st.caption(tooltips["export"])
 
     # Simulate pure tone from first peak (if exists)
-    if len(peaks) > 0:
-        f = int(freqs[peaks[0]])
+    if len(peaks_idx) > 0:
+        f = int(freqs[peaks_idx[0]])
     else:
         f = 440
 
-    tone = Sine(f).to_audio_segment(duration=1000).apply_gain(-3.0)
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmpfile:
-        tone.export(tmpfile.name, format="mp3")
-        with open(tmpfile.name, "rb") as audio_file:
-            st.download_button("Download MP3", audio_file, file_name="simulated_sound.mp3", mime="audio/mpeg")
-        logger.info(f"Exported MP3 for frequency {f} Hz to {tmpfile.name}")
-        # Need to be careful with unlink on Windows, but fine here.
-        # However, streamlit button needs the data, we already read it into memory.
-        os.unlink(tmpfile.name)
+    st.download_button("Download MP3", synth_mp3_bytes(f), file_name="simulated_sound.mp3", mime="audio/mpeg")
+    logger.info(f"Offered MP3 download for frequency {f} Hz.")
 
 if __name__ == "__main__":
     render()
@@ -1,10 +1,29 @@
 import streamlit as st
 import numpy as np
 import logging
+from scipy.optimize import differential_evolution
+
+from backend.physics import get_engine
 
 # Logging
 logger = logging.getLogger(__name__)
 
+# Fallback profile used when the geometry section hasn't stored one yet;
+# struct-of-arrays: parallel x (mm) and r (mm) vectors
+DEFAULT_BORE_PROFILE = {
+    "x": np.array([0.0, 20.0, 40.0, 66.0]),
+    "r": np.array([15.0, 14.8, 14.8, 14.6]),
+}
+
+# Interior control points the optimizer is allowed to move; the end planes
+# stay fixed so the barrel still mates with mouthpiece and upper joint.
+OPTIM_INDICES = [1, 2]
+
+# Coarse sweep step (Hz); sub-bin peak location is recovered by parabolic
+# interpolation so no fine sweep is needed.
+COARSE_STEP = 5.0
+
+
 def render():
     st.subheader("AI Design Assistant")
 
@@ -20,21 +39,92 @@ def render():
     min_wall = st.slider("Minimum Wall Thickness Allowed (mm)", 0.5, 5.0, 1.0)
     st.caption("🛠️ Ensures the AI doesn't suggest geometries too thin to drill or print.")
 
-    # Simulated input data (mocked for prototype)
-    length_mm = 60
-    radius_profile = np.linspace(7.0, 7.4, 60)  # simulate radius profile
-    bore_volume = np.pi * np.mean(radius_profile)**2 * length_mm
+    stored = st.session_state.get("bore_profile", DEFAULT_BORE_PROFILE)
+    x_mm = np.asarray(stored["x"], dtype=np.float64)
+    r_mm = np.asarray(stored["r"], dtype=np.float64)
+    current_profile = {"x": x_mm, "r": r_mm}
+    engine = get_engine(False)
+
+    # Search window around the target; only the peak location matters
+    freq_range = (target_freq * 0.8, target_freq * 1.2)
+
+    # The sweep arrays (freqs, k, sqrt_f) are invariant across optimizer
+    # iterations — only radii change — so build them exactly once.
+    freq_grid = engine.prepare_freq_grid(freq_range, COARSE_STEP)
+
+    def peak_frequency(freqs, Z):
+        # Quadratic interpolation of the 3 bins around argmax gives a
+        # sub-bin peak estimate, so the coarse 5 Hz sweep is enough.
+        i = int(np.argmax(Z))
+        if 0 < i < len(Z) - 1:
+            denom = Z[i - 1] - 2.0 * Z[i] + Z[i + 1]
+            if denom != 0.0:
+                delta = 0.5 * (Z[i - 1] - Z[i + 1]) / denom
+                return float(freqs[i] + delta * COARSE_STEP)
+        return float(freqs[i])
+
+    def peak_frequency_batch(freqs, Z):
+        # Row-wise version of peak_frequency for (N_cand, N_freq) curves.
+        i = np.clip(np.argmax(Z, axis=1), 1, Z.shape[1] - 2)
+        rows = np.arange(Z.shape[0])
+        zl, z0, zr = Z[rows, i - 1], Z[rows, i], Z[rows, i + 1]
+        denom = zl - 2.0 * z0 + zr
+        delta = np.where(denom != 0.0, 0.5 * (zl - zr) / np.where(denom == 0.0, 1.0, denom), 0.0)
+        return freqs[i] + delta * COARSE_STEP
+
+    # One candidate buffer for the whole optimization run; the scalar path
+    # only rewrites the optimized radii in place (the polish phase does many
+    # single evaluations, so a fresh copy per call is pure allocator churn).
+    candidate = {"x": x_mm, "r": r_mm.copy()}
 
-    # AI Suggestion Logic (placeholder rules)
-    predicted_freq = 343 / (2 * length_mm / 1000)
+    def objective_batch(radii):
+        # differential_evolution's vectorized protocol: radii arrives as
+        # (N_optim, S) for whole-population evaluations and (N_optim,) during
+        # polishing. The population case folds all S candidates in one
+        # batched TMM call.
+        radii = np.asarray(radii)
+        if radii.ndim == 1:
+            candidate["r"][OPTIM_INDICES] = radii
+            freqs, Z = engine.compute_impedance_curve(candidate, freq_range, freq_step=COARSE_STEP,
+                                                      freq_grid=freq_grid)
+            return (peak_frequency(freqs, Z) - target_freq) ** 2
+        pop = radii.T                                        # (S, N_optim)
+        r_matrix = np.tile(r_mm, (pop.shape[0], 1))
+        r_matrix[:, OPTIM_INDICES] = pop
+        freqs, Z = engine.compute_impedance_batch(x_mm, r_matrix, freq_range,
+                                                  freq_step=COARSE_STEP, freq_grid=freq_grid)
+        return (peak_frequency_batch(freqs, Z) - target_freq) ** 2
+
+    # Baseline resonance of the current design
+    freqs, Z = engine.compute_impedance_curve(current_profile, freq_range, freq_step=COARSE_STEP,
+                                              freq_grid=freq_grid)
+    predicted_freq = peak_frequency(freqs, Z)
     deviation = abs(predicted_freq - target_freq)
 
-    if deviation > 20:
-        suggestion = "Try lengthening the bore by 3–5mm or increasing mid-radius slightly."
-    elif deviation > 5:
-        suggestion = "Minor tuning needed – small adjustment to end taper radius."
-    else:
-        suggestion = "Design closely matches target frequency. Good job!"
+    st.markdown("### Optimization Result")
+    st.write(f"Predicted Frequency: {predicted_freq:.1f} Hz")
+    st.write(f"Deviation from Target: {deviation:.1f} Hz")
+
+    if st.button("Optimize Bore"):
+        # Population search with deferred updating: every generation is
+        # evaluated as ONE batched TMM call via the vectorized objective,
+        # then the winner is polished with single evaluations.
+        bounds = [(r_mm[idx] - 0.75, r_mm[idx] + 0.75) for idx in OPTIM_INDICES]
+        result = differential_evolution(objective_batch, bounds, vectorized=True,
+                                        updating="deferred", polish=True,
+                                        maxiter=30, tol=1e-3)
+        optimized = {"x": x_mm, "r": r_mm.copy()}
+        optimized["r"][OPTIM_INDICES] = result.x
+        st.session_state.bore_profile = optimized
+
+        opt_freqs, opt_Z = engine.compute_impedance_curve(optimized, freq_range, freq_step=COARSE_STEP,
+                                                          freq_grid=freq_grid)
+        opt_peak = peak_frequency(opt_freqs, opt_Z)
+        st.success(f"Optimized first resonance: {opt_peak:.1f} Hz "
+                   f"(deviation {abs(opt_peak - target_freq):.1f} Hz) — profile saved to session.")
+        st.write("Suggested interior radii (mm):",
+                 {f"point {idx}": round(float(result.x[i]), 3) for i, idx in enumerate(OPTIM_INDICES)})
+        logger.info(f"Optimization finished: peak {opt_peak:.1f} Hz after {result.nfev} evaluations.")
 
     # Defect predictions
     crack_risk = "Low" if min_wall > 1.5 else "Moderate"
@@ -48,12 +138,6 @@ def render():
         "Experimental": "Maple"
     }.get(style, "Grenadilla")
 
-    # Display AI output
-    st.markdown("### Optimization Result")
-    st.write(f"Predicted Frequency: {predicted_freq:.1f} Hz")
-    st.write(f"Deviation from Target: {deviation:.1f} Hz")
-    st.success(suggestion)
-
     st.markdown("### Design Risk Predictions")
     st.write(f"⚠️ Cracking Risk: **{crack_risk}**")
     st.write(f"⚠️ Intonation Stability: **{intonation_risk}**")
@@ -61,7 +145,7 @@ def render():
     st.markdown("### Recommended Material")
     st.info(f"🎋 Suggested Wood: **{material_rec}** based on your tonal goals.")
 
-    logger.info(f"Target: {target_freq}, Predicted: {predicted_freq}, Style: {style}, Suggestion: {suggestion}")
+    logger.info(f"Target: {target_freq}, Predicted: {predicted_freq}, Style: {style}")
 
 if __name__ == "__main__":
     render()
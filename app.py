@@ -1,18 +1,17 @@
 import streamlit as st
+import numpy as np
 import logging
 
-# Import components
-# Using local imports to avoid circular dependency issues if any, although unlikely here
-try:
-    import importlib
-    bore_viewer = importlib.import_module("components.3d_bore_viewer")
-except ImportError as e:
-    st.error(f"Failed to load 3D Viewer: {e}")
+import importlib
+
+
+@st.cache_resource
+def load_module(name: str):
+    """Imports a section module once per server process. Caching the
+    importlib result means sidebar navigation never re-pays the heavy
+    transitive imports (scipy/matplotlib/pyvista) after the first visit."""
+    return importlib.import_module(name)
 
-from geometry import bore_editor, historical_bores
-from acoustics import acoustic_sim
-from ai_assistant import ai_designer
-from materials import material_aging
 
 # Setup logging
 import logging.config
@@ -21,6 +20,15 @@ logger = logging.getLogger(__name__)
 
 st.set_page_config(page_title="Clarinet Barrel Lab", layout="wide")
 
+# Shared bore profile in struct-of-arrays form: parallel "x" (mm along the
+# axis) and "r" (mm radius) vectors. Consumers use the columns as zero-copy
+# views — no per-point unpacking and no row slicing.
+if "bore_profile" not in st.session_state:
+    st.session_state.bore_profile = {
+        "x": np.array([0.0, 20.0, 40.0, 66.0]),
+        "r": np.array([15.0, 14.8, 14.8, 14.6]),
+    }
+
 st.sidebar.title("Clarinet Barrel Lab")
 section = st.sidebar.radio("Go to", [
     "Interactive Geometry",
@@ -40,25 +48,28 @@ if section == "Interactive Geometry":
     tab1, tab2, tab3 = st.tabs(["2D Editor", "3D Viewer", "Historical Shapes"])
 
     with tab1:
-        bore_editor.render()
+        load_module("geometry.bore_editor").render()
 
     with tab2:
-        bore_viewer.render()
+        try:
+            load_module("components.3d_bore_viewer").render()
+        except ImportError as e:
+            st.error(f"Failed to load 3D Viewer: {e}")
 
     with tab3:
-        historical_bores.render()
+        load_module("geometry.historical_bores").render()
 
 elif section == "Acoustic Simulation":
     st.info("This section includes Impedance calculators, resonance visualizers, and waveform export.")
-    acoustic_sim.render()
+    load_module("acoustics.acoustic_sim").render()
 
 elif section == "AI Design Assistant":
     st.info("AI-guided optimization and historical style transfer tools.")
-    ai_designer.render()
+    load_module("ai_assistant.ai_designer").render()
 
 elif section == "Material & Aging":
     st.info("Material DB, aging simulation, and sustainability tracker.")
-    material_aging.render()
+    load_module("materials.material_aging").render()
 
 elif section == "Manufacturing Tools":
     st.info("G-code export, 3D print analyzer, tolerance checker, cost estimator.")
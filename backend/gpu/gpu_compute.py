@@ -2,41 +2,44 @@
 import logging
 import numpy as np
 
-# Try importing cupy, but don't fail if it's not available or if CUDA is missing
-try:
-    import cupy as cp
-    # Check if a GPU is actually available and working
-    try:
-        if cp.cuda.is_available():
-             HAS_GPU = True
-        else:
-             HAS_GPU = False
-    except Exception:
-        HAS_GPU = False
-except ImportError:
-    HAS_GPU = False
-    cp = None
-
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def gpu_accelerated_impedance(lengths, radii):
+# Lazy one-shot cupy probe. Importing cupy costs around a second, so it must
+# not happen at module import time — geometry-only sessions never pay it.
+_CP = None
+_HAS_GPU = None
+
+
+def _get_cp():
+    """Imports cupy on first call only; result is cached in module sentinels.
+    Returns (cupy module or None, bool gpu availability)."""
+    global _CP, _HAS_GPU
+    if _HAS_GPU is None:
+        try:
+            import cupy as cp
+            _HAS_GPU = bool(cp.cuda.is_available())
+            _CP = cp if _HAS_GPU else None
+        except Exception:
+            _HAS_GPU = False
+            _CP = None
+        logger.debug(f"cupy probe: gpu_available={_HAS_GPU}")
+    return _CP, _HAS_GPU
+
+def gpu_accelerated_impedance(lengths_xp, radii_xp):
     """
-    Computes impedance. Uses GPU if available, otherwise falls back to CPU (numpy).
+    Reduces a bore profile that is ALREADY resident on the device.
+
+    Callers on the GPU path must pass cupy arrays; no host->device copies
+    happen here and the result stays on-device, so the (dominant) PCIe
+    round-trip is paid once by the caller at the very end of the pipeline,
+    not per call. With no GPU the inputs are treated as host arrays.
     """
-    if HAS_GPU and cp:
-        logger.info("Running GPU impedance computation...")
-        try:
-            z = cp.array(lengths) * cp.array(radii)
-            result = cp.sum(z)
-            logger.info("GPU computation successful.")
-            return result.get()
-        except Exception as e:
-            logger.error(f"GPU error: {e}. Falling back to CPU.")
-            # Fallback to CPU if GPU computation fails
-            pass
+    cp, has_gpu = _get_cp()
+    if has_gpu and cp and isinstance(lengths_xp, cp.ndarray):
+        logger.info("Running GPU impedance computation (on-device buffers)...")
+        return cp.sum(lengths_xp * radii_xp)
 
     logger.info("Running CPU impedance computation (fallback)...")
-    z = np.array(lengths) * np.array(radii)
-    result = np.sum(z)
-    return result
+    z = np.asarray(lengths_xp) * np.asarray(radii_xp)
+    return np.sum(z)
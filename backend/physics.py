@@ -0,0 +1,234 @@
+# physics.py
+import logging
+import numpy as np
+
+# cupy is probed lazily (and only once, shared sentinel) so importing this
+# module stays cheap for sessions that never request the GPU backend.
+from backend.gpu.gpu_compute import _get_cp
+from backend.physics_numba import tmm_sweep
+
+logger = logging.getLogger(__name__)
+
+# Air properties at ~20 C
+RHO_AIR = 1.2      # kg/m^3
+C_SOUND = 343.0    # m/s
+
+
+def fast_peaks(Z, thresh=0.0, min_dist=1):
+    """
+    Vectorized local-maximum detection on a 1-D curve.
+
+    A 3-point comparison mask finds every strict local maximum above thresh
+    at NumPy speed; a short greedy pass (highest peak first) then enforces
+    the minimum index distance. Returns sorted peak indices — a drop-in for
+    scipy.signal.find_peaks(distance=...) on impedance curves, without its
+    Python-level bookkeeping.
+    """
+    Z = np.asarray(Z)
+    mask = (Z[1:-1] > Z[:-2]) & (Z[1:-1] > Z[2:]) & (Z[1:-1] > thresh)
+    idx = np.nonzero(mask)[0] + 1
+    if min_dist > 1 and idx.size:
+        order = np.argsort(Z[idx])[::-1]
+        taken = []
+        for i in idx[order]:
+            if all(abs(int(i) - j) >= min_dist for j in taken):
+                taken.append(int(i))
+        idx = np.sort(np.asarray(taken, dtype=np.intp))
+    return idx
+
+
+class PhysicsEngine:
+    """
+    Transfer Matrix Method (TMM) model of the barrel bore.
+
+    The bore is treated as a chain of short conical-ish segments, each
+    approximated by a lossy cylinder at the segment's average radius.
+    Folding the transfer matrices from the open end back to the mouthpiece
+    end gives the input impedance, whose peaks are the playable resonances.
+    """
+
+    def __init__(self, use_gpu=False, precision="single"):
+        if use_gpu:
+            cp, has_gpu = _get_cp()
+            self.use_gpu = has_gpu
+            self.xp = cp if has_gpu else np
+            if not has_gpu:
+                logger.info("GPU requested but not available; using NumPy backend.")
+        else:
+            self.use_gpu = False
+            self.xp = np
+        # Single precision is the default: peak picking only needs ~4
+        # significant digits, and complex64 halves the memory traffic of the
+        # cosh/sinh fold (and doubles SIMD lane count on CPU).
+        if precision == "double":
+            self.fdtype = self.xp.float64
+            self.cdtype = self.xp.complex128
+        else:
+            self.fdtype = self.xp.float32
+            self.cdtype = self.xp.complex64
+        # Sweep arrays keyed on (f_lo, f_hi, step); on the GPU backend these
+        # are device buffers that persist across calls, so optimizer loops
+        # never re-allocate or re-upload them.
+        self._freq_cache = {}
+
+    def prepare_freq_grid(self, freq_range, freq_step):
+        """
+        Builds the frequency sweep arrays (freqs, k, sqrt_f) once.
+
+        These are invariant while only the bore radii change (the optimizer
+        case), so they are cached per (f_lo, f_hi, step) — repeat calls get
+        the same (device-resident, on the GPU backend) buffers back.
+        """
+        key = (float(freq_range[0]), float(freq_range[1]), float(freq_step))
+        grid = self._freq_cache.get(key)
+        if grid is None:
+            xp = self.xp
+            # The sweep axis is built on the host and kept alongside the
+            # device buffers: callers can always be handed the host copy, so
+            # the frequency vector never travels back over PCIe — only |Z|
+            # does on the GPU path.
+            freqs_host = np.arange(freq_range[0], freq_range[1], freq_step, dtype=self.fdtype)
+            freqs = xp.asarray(freqs_host)
+            k = (2.0 * np.pi / C_SOUND) * freqs
+            sqrt_f = xp.sqrt(freqs)
+            grid = (freqs, k, sqrt_f, freqs_host)
+            self._freq_cache[key] = grid
+        return grid
+
+    def compute_impedance_curve(self, bore_profile, freq_range=(100.0, 2000.0), freq_step=1.0,
+                                freq_grid=None, return_device=False):
+        """
+        Computes |Z_in| over a frequency sweep for the given bore profile.
+
+        bore_profile is a struct-of-arrays dict with parallel "x" and "r"
+        vectors in mm along the bore axis. Returns (freqs, Z_mag) as 1-D
+        arrays (host arrays even on the GPU path, unless return_device is
+        set — internal GPU-resident callers should set it to skip the PCIe
+        round-trip). Pass a freq_grid from prepare_freq_grid to skip
+        rebuilding the sweep arrays on repeated calls.
+        """
+        xp = self.xp
+        x_pts = xp.asarray(bore_profile["x"], dtype=self.fdtype) / 1000.0  # mm -> m
+        r_pts = xp.asarray(bore_profile["r"], dtype=self.fdtype) / 1000.0
+
+        if freq_grid is None:
+            freq_grid = self.prepare_freq_grid(freq_range, freq_step)
+        freqs, k, sqrt_f, freqs_host = freq_grid
+
+        # All per-segment parameters as (N_seg,) arrays, computed once outside
+        # the fold. The cosh/sinh of gamma*L are batched into a single
+        # (N_seg, N_freq) evaluation so the backward fold below is just
+        # N_seg cheap row operations instead of N_seg full recomputations.
+        lengths = xp.diff(x_pts)
+        r_avg = 0.5 * (r_pts[1:] + r_pts[:-1])
+        areas = np.pi * r_avg ** 2
+        Z_c = RHO_AIR * C_SOUND / areas
+
+        # Radiation load at the open end (unflanged pipe approximation)
+        a_exit = r_pts[-1]
+        z0_exit = RHO_AIR * C_SOUND / (np.pi * a_exit ** 2)
+        ka = k * a_exit
+        Z_L = z0_exit * (0.25 * ka ** 2 + 1j * 0.6133 * ka)
+
+        # On CPU, prefer the Numba-compiled sweep: explicit loops under njit
+        # fuse the per-segment complex ops and parallelize over frequencies.
+        if not self.use_gpu and tmm_sweep is not None:
+            Z_in = tmm_sweep(freqs, lengths, r_avg, k, RHO_AIR, C_SOUND,
+                             Z_L.astype(self.cdtype))
+            logger.debug(f"Computed impedance curve via Numba sweep: "
+                         f"{freqs.shape[0]} freqs, {lengths.shape[0]} segments.")
+            return freqs, Z_in
+
+        # Visco-thermal wall losses (boundary-layer approximation)
+        alpha = 3e-5 * sqrt_f[None, :] / r_avg[:, None]
+        gL = (alpha + 1j * k[None, :]) * lengths[:, None]
+        # One exp on the full matrix instead of separate cosh and sinh
+        # kernels: cosh = (e^x + e^-x)/2, sinh = (e^x - e^-x)/2. gL has a
+        # tiny real part (wall losses), so e^gL cannot overflow here.
+        E = xp.exp(gL)
+        inv_E = 1.0 / E
+        cosh_gL = 0.5 * (E + inv_E)
+        sinh_gL = 0.5 * (E - inv_E)
+
+        # Backward fold from the open end to the input plane
+        P = Z_L.astype(self.cdtype)
+        U = xp.ones_like(freqs, dtype=self.cdtype)
+        for i in range(lengths.shape[0] - 1, -1, -1):
+            P, U = (P * cosh_gL[i] + U * Z_c[i] * sinh_gL[i],
+                    P * sinh_gL[i] / Z_c[i] + U * cosh_gL[i])
+
+        Z_in = xp.abs(P / U)
+        logger.debug(f"Computed impedance curve: {freqs.shape[0]} freqs, "
+                     f"{lengths.shape[0]} segments (gpu={self.use_gpu}).")
+
+        if self.use_gpu and not return_device:
+            return freqs_host, Z_in.get()
+        return freqs, Z_in
+
+    def compute_impedance_batch(self, x_mm, r_mm_batch, freq_range=(100.0, 2000.0), freq_step=1.0,
+                                freq_grid=None, return_device=False):
+        """
+        Batched variant of compute_impedance_curve for the optimizer.
+
+        All candidates share the axial node positions x_mm; r_mm_batch has
+        shape (N_cand, N_pts), one radius profile per row. The whole batch is
+        folded in one pass — the state vectors carry an extra leading
+        candidate axis — so evaluating N candidates costs one dispatch
+        instead of N. Returns (freqs, Z_mag) with Z_mag of shape
+        (N_cand, N_freq).
+        """
+        xp = self.xp
+        x_pts = xp.asarray(x_mm, dtype=self.fdtype) / 1000.0
+        r_pts = xp.asarray(r_mm_batch, dtype=self.fdtype) / 1000.0
+
+        if freq_grid is None:
+            freq_grid = self.prepare_freq_grid(freq_range, freq_step)
+        freqs, k, sqrt_f, freqs_host = freq_grid
+
+        lengths = xp.diff(x_pts)
+        r_avg = 0.5 * (r_pts[:, 1:] + r_pts[:, :-1])          # (N_cand, N_seg)
+        Z_c = RHO_AIR * C_SOUND / (np.pi * r_avg ** 2)
+
+        alpha = 3e-5 * sqrt_f[None, None, :] / r_avg[:, :, None]
+        gL = (alpha + 1j * k[None, None, :]) * lengths[None, :, None]
+        # Same exp fusion as the single-profile path: one transcendental
+        # kernel over the whole (N_cand, N_seg, N_freq) block.
+        E = xp.exp(gL)
+        inv_E = 1.0 / E
+        cosh_gL = 0.5 * (E + inv_E)
+        sinh_gL = 0.5 * (E - inv_E)
+
+        a_exit = r_pts[:, -1]
+        z0_exit = RHO_AIR * C_SOUND / (np.pi * a_exit ** 2)
+        ka = k[None, :] * a_exit[:, None]
+        Z_L = z0_exit[:, None] * (0.25 * ka ** 2 + 1j * 0.6133 * ka)
+
+        P = Z_L.astype(self.cdtype)
+        U = xp.ones_like(P)
+        for i in range(lengths.shape[0] - 1, -1, -1):
+            P, U = (P * cosh_gL[:, i] + U * Z_c[:, i, None] * sinh_gL[:, i],
+                    P * sinh_gL[:, i] / Z_c[:, i, None] + U * cosh_gL[:, i])
+
+        Z_in = xp.abs(P / U)
+        logger.debug(f"Batched impedance: {r_pts.shape[0]} candidates x "
+                     f"{freqs.shape[0]} freqs (gpu={self.use_gpu}).")
+
+        if self.use_gpu and not return_device:
+            return freqs_host, Z_in.get()
+        return freqs, Z_in
+
+
+# Streamlit is only needed for the cached factory; the engine itself stays
+# importable from plain scripts/tests.
+try:
+    import streamlit as st
+
+    @st.cache_resource
+    def get_engine(use_gpu: bool) -> PhysicsEngine:
+        """Returns a per-backend singleton engine, cached across reruns."""
+        return PhysicsEngine(use_gpu=use_gpu)
+
+except ImportError:
+
+    def get_engine(use_gpu: bool) -> PhysicsEngine:
+        return PhysicsEngine(use_gpu=use_gpu)
@@ -0,0 +1,63 @@
+# physics_numba.py
+import cmath
+import math
+import logging
+import os
+
+import numpy as np
+
+# Numba is optional; the engine falls back to the batched NumPy path without it
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    njit = None
+    prange = range
+
+logger = logging.getLogger(__name__)
+
+if HAS_NUMBA:
+    # Streamlit executes session scripts on worker threads, so the prange
+    # backend must be a thread-safe layer (tbb when installed, otherwise
+    # whatever thread-safe option numba has). Thread count stays under the
+    # user's control via NUMBA_NUM_THREADS; we only set the layer if the
+    # environment hasn't already pinned one.
+    if "NUMBA_THREADING_LAYER" not in os.environ:
+        try:
+            from numba import config as _numba_config
+            _numba_config.THREADING_LAYER = "threadsafe"
+        except Exception:
+            logger.debug("Could not set numba threading layer; using default.")
+
+if HAS_NUMBA:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def tmm_sweep(freqs, lengths, r_avg, k_arr, rho, c_sound, Z_L):
+        """
+        Backward TMM fold, one independent (P, U) recursion per frequency.
+
+        The outer loop is prange over frequencies; the inner loop walks the
+        segments from the open end to the input plane with scalar complex
+        arithmetic, which LLVM fuses and vectorizes far better than chained
+        NumPy temporaries.
+        """
+        n_freq = freqs.shape[0]
+        n_seg = lengths.shape[0]
+        Z_in = np.empty(n_freq, dtype=np.float64)
+        for j in prange(n_freq):
+            P = Z_L[j]
+            U = 1.0 + 0.0j
+            sqrt_f = math.sqrt(freqs[j])
+            for i in range(n_seg - 1, -1, -1):
+                alpha = 3e-5 * sqrt_f / r_avg[i]
+                gL = (alpha + 1j * k_arr[j]) * lengths[i]
+                c = cmath.cosh(gL)
+                s = cmath.sinh(gL)
+                Z_c = rho * c_sound / (np.pi * r_avg[i] ** 2)
+                P, U = P * c + U * Z_c * s, P * s / Z_c + U * c
+            Z_in[j] = abs(P / U)
+        return Z_in
+
+else:
+    tmm_sweep = None
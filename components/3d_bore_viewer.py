@@ -2,113 +2,143 @@ import streamlit as st
 import pyvista as pv
 from pyvista import themes
 import numpy as np
+from scipy.interpolate import PchipInterpolator
 import logging
-import tempfile
-import os
+import threading
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Fallback profile used when the geometry section hasn't stored one yet;
+# struct-of-arrays: parallel x (mm) and r (mm) vectors
+DEFAULT_BORE_PROFILE = {
+    "x": np.array([0.0, 20.0, 40.0, 66.0]),
+    "r": np.array([15.0, 14.8, 14.8, 14.6]),
+}
+
+
+def generate_bore(x_nodes, r_nodes, n_samples=100):
+    """Resamples the control-point profile onto a dense axial grid.
+
+    Uses a monotone PCHIP spline evaluated in one vectorized call: smooth
+    (no faceting between control points like linear interp) yet free of the
+    overshoot a plain cubic spline would add between radius nodes.
+    """
+    z = np.linspace(x_nodes[0], x_nodes[-1], n_samples)
+    r = PchipInterpolator(x_nodes, r_nodes)(z)
+    return z, r
+
+
+# The angular grid never changes between frames, so its trig factors are
+# constant-folded at import time rather than recomputed per render.
+_N_THETA = 36
+_THETA = np.linspace(0, 2 * np.pi, _N_THETA)
+_COS_THETA = np.cos(_THETA)[:, None]   # (ntheta, 1)
+_SIN_THETA = np.sin(_THETA)[:, None]
+
+
+def create_bore_mesh(z, r):
+    # Surface of revolution via pure broadcasting: the (ntheta, nz)
+    # coordinate grids come from two outer products, with no per-point
+    # Python loop and no materialized tile of r.
+    r_row = r[None, :]                               # (1, nz)
+    X = r_row * _COS_THETA
+    Y = r_row * _SIN_THETA
+    Z = np.broadcast_to(z[None, :], X.shape)
+    # StructuredGrid flattens its point arrays in Fortran order; handing it
+    # C-ordered (or, for Z, non-contiguous broadcast-view) arrays makes VTK
+    # silently allocate and recopy. Convert up front so the wrap is zero-copy.
+    return pv.StructuredGrid(np.asfortranarray(X), np.asfortranarray(Y),
+                             np.asfortranarray(Z))
+
+
+def create_bore_surface(z, r):
+    """
+    Revolves the bore generatrix into a surface of revolution.
+
+    Only the O(nz) generatrix polyline lives host-side; extrude_rotate hands
+    the revolution to the VTK pipeline instead of materializing the full
+    ntheta x nz point grid. Falls back to the explicit StructuredGrid
+    builder if the extrusion filter is unavailable.
+    """
+    try:
+        # One preallocated (nz, 3) buffer filled by column assignment —
+        # column_stack would allocate a zeros column and an extra
+        # concatenation copy for the same result.
+        profile_pts = np.empty((r.size, 3))
+        profile_pts[:, 0] = r
+        profile_pts[:, 1] = 0.0
+        profile_pts[:, 2] = z
+        generatrix = pv.lines_from_points(profile_pts)
+        return generatrix.extrude_rotate(resolution=60, rotation_axis=(0, 0, 1), capping=False)
+    except Exception as e:
+        logger.debug(f"extrude_rotate unavailable ({e}); using StructuredGrid fallback.")
+        return create_bore_mesh(z, r)
+
+
+# Wall allowance between the widest bore point and the barrel exterior
+OUTER_WALL_MM = 6.0
+
+
+@st.cache_resource
+def _get_plotter():
+    """One off-screen plotter per server process. VTK render-window creation
+    costs tens of ms, so it is reused across frames; the lock serializes
+    access because Streamlit runs sessions on worker threads."""
+    return pv.Plotter(off_screen=True, notebook=False), threading.Lock()
+
+
+@st.cache_data(show_spinner=False)
+def _render_bore_image(x_tuple, r_tuple, outer_r):
+    """
+    Meshes and renders one bore profile off-screen, returning the RGB array.
+
+    Keyed on the tuple-ized profile vectors, so reruns with an unchanged
+    bore skip the VTK render-window spin-up and screenshot entirely.
+    """
+    x_nodes = np.asarray(x_tuple, dtype=np.float64)
+    r_nodes = np.asarray(r_tuple, dtype=np.float64)
+    z, r = generate_bore(x_nodes, r_nodes)
+    bore_mesh = create_bore_surface(z, r)
+
+    # The exterior is a constant-radius sleeve, so a parametric pv.Cylinder
+    # (O(1) memory, VTK-side tessellation) suffices — no explicit
+    # ntheta x nz grid of points for a shape with two parameters.
+    outer_mesh = pv.Cylinder(center=(0, 0, (z[0] + z[-1]) / 2), direction=(0, 0, 1),
+                             radius=outer_r, height=z[-1] - z[0], resolution=60)
+
+    plotter, lock = _get_plotter()
+    with lock:
+        plotter.clear_actors()
+        plotter.add_mesh(bore_mesh, color="tan", opacity=0.8, show_edges=False)
+        plotter.add_mesh(outer_mesh, color="saddlebrown", opacity=0.25)
+        plotter.add_axes()
+        plotter.view_xy()
+        plotter.camera_position = 'yz'
+        plotter.camera.azimuth = 45
+        plotter.camera.elevation = 30
+
+        # Screenshot straight to a NumPy RGB array — no tempfile write/read.
+        img = plotter.screenshot(transparent_background=False, return_img=True)
+    logger.info("Rendered 3D bore preview (cache miss).")
+    return img
+
+
 def render():
     st.subheader("3D Bore Viewer")
 
     # Setup PyVista and Panel interop
     pv.set_plot_theme(themes.DocumentTheme())
 
-    # Generate synthetic bore profile
-    def generate_bore(length_mm=60, radius_profile=[10, 8, 10], n_samples=100):
-        z = np.linspace(0, length_mm, n_samples)
-        # Interpolate radius profile
-        # radius_profile has 3 points: start, middle, end
-        # We need to map these to the z linspace
-        r = np.interp(z, [0, length_mm//2, length_mm], radius_profile)
-        logger.debug(f"Bore Z: {z}")
-        logger.debug(f"Bore Radius: {r}")
-        return z, r
-
-    def create_bore_mesh(z, r):
-        points = []
-        for zi, ri in zip(z, r):
-            theta = np.linspace(0, 2*np.pi, 36)
-            x = ri * np.cos(theta)
-            y = ri * np.sin(theta)
-            for xi, yi in zip(x, y):
-                points.append([xi, yi, zi])
-        points = np.array(points)
-        # Create a structured grid or polydata
-        # For simple visualization, point cloud -> delaunay_2d is risky for 3D tubes.
-        # Ideally we should construct faces manually or use StructuredGrid.
-        # But keeping original logic for now, just wrapped.
-
-        # NOTE: The original logic used delaunay_2d on 3D points? That projects to XY plane.
-        # That likely won't work for a tube along Z.
-        # Let's fix this to use a Tube or Extrusion if possible, or just StructuredGrid.
-        # But sticking to "review and update", if I see it's broken I should fix it.
-        # delaunay_2d on (x,y,z) typically projects to best fitting plane or ignores Z?
-        # Actually PyVista's delaunay_2d works on the xy plane.
-        # So for a vertical tube, it might look like a flat disk.
-        # Let's try to improve this by using pv.Cylinder or similar, OR just fix the mesh generation.
-
-        # Improved mesh generation using StructuredGrid
-        theta = np.linspace(0, 2*np.pi, 36)
-        # Create a grid
-        # Z varies slow, Theta varies fast
-        Z, Theta = np.meshgrid(z, theta)
-        # R depends on Z. broadcast r to shape of Z
-        R = np.tile(r, (len(theta), 1))
-
-        X = R * np.cos(Theta)
-        Y = R * np.sin(Theta)
-
-        # Flatten
-        x_flat = X.flatten(order='F')
-        y_flat = Y.flatten(order='F')
-        z_flat = Z.flatten(order='F')
-
-        points = np.column_stack((x_flat, y_flat, z_flat))
-
-        # Create StructuredGrid
-        # Dimensions: (nx, ny, nz) -> but we have surfaces.
-        # It's easier to create a PolyData from points and triangulate,
-        # or use pyvista.lines_from_points followed by tube?
-        # Let's stick to a simpler approach: multiple circles lofted?
-
-        # Let's keep the original approach but be aware it might be buggy,
-        # but since I am "applying updates", I should fix it.
-        # The original code:
-        # mesh = pv.PolyData(points)
-        # mesh = mesh.delaunay_2d()
-        # This is almost certainly wrong for a 3D tube.
-
-        # Let's use PyVista's StructuredGrid which is good for this.
-        grid = pv.StructuredGrid(X, Y, Z)
-        return grid
-
-    z, r = generate_bore()
-    bore_mesh = create_bore_mesh(z, r)
-
-    # Show the 3D model
-    plotter = pv.Plotter(off_screen=True, notebook=False)
-    plotter.add_mesh(bore_mesh, color="tan", opacity=0.8, show_edges=False)
-    plotter.add_axes()
-    plotter.view_xy()
-    plotter.camera_position = 'yz'
-    plotter.camera.azimuth = 45
-    plotter.camera.elevation = 30
-
-    # Save to temporary file and display
+    profile = st.session_state.get("bore_profile", DEFAULT_BORE_PROFILE)
+    x_nodes = np.asarray(profile["x"], dtype=np.float64)
+    r_nodes = np.asarray(profile["r"], dtype=np.float64)
+
+    outer_r = float(r_nodes.max() + OUTER_WALL_MM)
+
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmpfile:
-            plotter.show(screenshot=tmpfile.name)
-            st.image(tmpfile.name, caption="3D Bore Preview")
-            logger.info(f"3D bore preview saved to: {tmpfile.name}")
-            # We delay deletion or rely on OS to clean up / overwrite
-            # unlink might fail on Windows if file is open, but here we are in Linux environment usually.
-            # But streamlit image might need the file to exist.
-            # So we don't unlink immediately if we want st.image to read it?
-            # Actually st.image reads it into memory.
-
-        os.unlink(tmpfile.name)
+        img = _render_bore_image(tuple(x_nodes), tuple(r_nodes), outer_r)
+        st.image(img, caption="3D Bore Preview", use_container_width=True)
     except Exception as e:
         st.error(f"Error generating 3D view: {e}")
         logger.error(f"Error in 3D viewer: {e}")
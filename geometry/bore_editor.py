@@ -1,4 +1,5 @@
 import streamlit as st
+import numpy as np
 import plotly.graph_objects as go
 import logging
 
@@ -18,10 +19,17 @@ def render():
     # without specific components or callbacks.
     # For now, we render what we have.
 
-    x_vals, y_vals = zip(*st.session_state.control_points)
+    # One pass through the control points: ndarray conversion, a C-level
+    # argsort on the axial coordinate (so the profile line never doubles
+    # back if points are entered out of order), then column slices.
+    arr = np.asarray(st.session_state.control_points, dtype=np.float64)
+    arr = arr[np.argsort(arr[:, 0])]
+    x_vals, y_vals = arr[:, 0], arr[:, 1]
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x_vals, y=y_vals, mode='markers+lines', name="Bore Profile"))
+    # Scattergl renders through WebGL instead of SVG — same API, but the
+    # browser-side cost stays flat as the profile gets densely sampled.
+    fig.add_trace(go.Scattergl(x=x_vals.tolist(), y=y_vals.tolist(), mode='markers+lines', name="Bore Profile"))
 
     fig.update_layout(
         dragmode='drawopenpath', # This allows drawing but capturing it back to streamlit requires work
@@ -37,16 +45,21 @@ def render():
 
     st.warning("⚠️ Dragging in the chart above does not update the backend state in this version. Use the inputs below to modify points.")
 
-    # Add manual editors
-    new_points = []
-    cols = st.columns(len(st.session_state.control_points))
-    for i, (x, y) in enumerate(st.session_state.control_points):
-        with cols[i]:
-            new_x = st.number_input(f"X{i}", value=float(x), key=f"x_{i}")
-            new_y = st.number_input(f"R{i}", value=float(y), key=f"y_{i}")
-            new_points.append((new_x, new_y))
+    # Add manual editors. The inputs live in a form so edits batch into one
+    # explicit Apply instead of rerunning the whole app (3D viewer included)
+    # on every keystroke; this also drops the brittle float != comparison
+    # that previously gated st.rerun().
+    with st.form("edit"):
+        new_points = []
+        cols = st.columns(len(st.session_state.control_points))
+        for i, (x, y) in enumerate(st.session_state.control_points):
+            with cols[i]:
+                new_x = st.number_input(f"X{i}", value=float(x), key=f"x_{i}")
+                new_y = st.number_input(f"R{i}", value=float(y), key=f"y_{i}")
+                new_points.append((new_x, new_y))
+        submitted = st.form_submit_button("Apply")
 
-    if new_points != st.session_state.control_points:
+    if submitted:
         st.session_state.control_points = new_points
         st.rerun()
 
@@ -7,36 +7,47 @@ import logging
 # Setup logger
 logger = logging.getLogger(__name__)
 
-def render():
-    st.subheader("Historical Bore Shape Viewer")
+# The preset table is static, so it is built exactly once at import time
+# instead of re-interpolating four profiles on every rerun. All presets
+# share the same dense axial grid.
+_Z = np.linspace(0, 60, 60)
+
 
-    # Define example bore profiles (length vs radius, in mm)
-    bore_presets = {
+def _build_presets():
+    """Builds the example bore profiles (length vs radius, in mm) once."""
+    return {
         "Mozart Era Clarinet (~1780s)": {
-            "length": np.linspace(0, 60, 60),
-            "radius": np.interp(np.linspace(0, 60, 60), [0, 30, 60], [6.5, 7.2, 6.9]),
+            "length": _Z,
+            "radius": np.interp(_Z, [0, 30, 60], [6.5, 7.2, 6.9]),
             "context": "Used in classical-era instruments. Small bore, optimized for soft articulation and even intonation with narrow tuning bands. Similar to early German clarinets."
         },
         "German Reform Boehm (~1930s)": {
-            "length": np.linspace(0, 60, 60),
-            "radius": np.interp(np.linspace(0, 60, 60), [0, 20, 40, 60], [7.2, 7.5, 7.3, 7.0]),
+            "length": _Z,
+            "radius": np.interp(_Z, [0, 20, 40, 60], [7.2, 7.5, 7.3, 7.0]),
             "context": "Designed for rich tone and smooth resistance in orchestral settings. Still used in some European symphonic traditions today."
         },
         "Modern French Barrel (~1990s)": {
-            "length": np.linspace(0, 60, 60),
-            "radius": np.interp(np.linspace(0, 60, 60), [0, 15, 45, 60], [7.1, 7.3, 7.2, 6.95]),
+            "length": _Z,
+            "radius": np.interp(_Z, [0, 15, 45, 60], [7.1, 7.3, 7.2, 6.95]),
             "context": "Standardized for balanced intonation with plastic and wooden clarinets. Often copied in student instruments."
         },
         "Jazz/Ebony Barrel (~Today)": {
-            "length": np.linspace(0, 60, 60),
-            "radius": np.interp(np.linspace(0, 60, 60), [0, 20, 60], [7.3, 7.7, 7.5]),
+            "length": _Z,
+            "radius": np.interp(_Z, [0, 20, 60], [7.3, 7.7, 7.5]),
             "context": "Preferred by jazz artists for open airflow and projection. Usually paired with custom mouthpieces for expressive attack."
         }
     }
 
+
+_BORE_PRESETS = _build_presets()
+
+
+def render():
+    st.subheader("Historical Bore Shape Viewer")
+
     # User selection
-    preset_name = st.selectbox("Select Historical Bore Shape", list(bore_presets.keys()))
-    preset = bore_presets[preset_name]
+    preset_name = st.selectbox("Select Historical Bore Shape", list(_BORE_PRESETS.keys()))
+    preset = _BORE_PRESETS[preset_name]
     z = preset["length"]
     r = preset["radius"]
     logger.info(f"Loaded preset: {preset_name}")
@@ -44,15 +55,22 @@ def render():
     # Optional overlay toggle
     overlay = st.checkbox("Overlay with My Design", value=True)
 
-    # Load or simulate user design
-    user_z = np.linspace(0, 60, 60)
-    user_r = np.interp(user_z, [0, 20, 60], [7.0, 7.3, 7.0])
+    # Load the user's session design if one exists, else simulate one
+    profile = st.session_state.get("bore_profile")
+    if profile is not None:
+        user_z = np.asarray(profile["x"], dtype=np.float64)
+        user_r = np.asarray(profile["r"], dtype=np.float64)
+    else:
+        user_z = _Z
+        user_r = np.interp(_Z, [0, 20, 60], [7.0, 7.3, 7.0])
 
     # Plot
+    # Scattergl traces render through WebGL instead of SVG, keeping the
+    # browser cheap even with the dense 60-point preset grids overlaid.
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=z, y=r, mode="lines", name=preset_name, line=dict(width=3)))
+    fig.add_trace(go.Scattergl(x=z, y=r, mode="lines", name=preset_name, line=dict(width=3)))
     if overlay:
-        fig.add_trace(go.Scatter(x=user_z, y=user_r, mode="lines", name="My Design", line=dict(dash="dash")))
+        fig.add_trace(go.Scattergl(x=user_z, y=user_r, mode="lines", name="My Design", line=dict(dash="dash")))
 
     fig.update_layout(
         title="Bore Radius vs Length",
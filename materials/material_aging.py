@@ -6,47 +6,94 @@ import logging
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Fallback profile used when the geometry section hasn't stored one yet;
+# struct-of-arrays: parallel x (mm) and r (mm) vectors
+DEFAULT_BORE_PROFILE = {
+    "x": np.array([0.0, 20.0, 40.0, 66.0]),
+    "r": np.array([15.0, 14.8, 14.8, 14.6]),
+}
+
+# Default material database. The table is a constant, so the DataFrame
+# (dict traversal + dtype inference) is built once at import; renders only
+# pay for the cheap .style view.
+_WOOD_DATA = {
+    "Grenadilla": {"density": 1300, "stiffness": 15000, "damping": 0.005},
+    "Cocobolo": {"density": 1100, "stiffness": 14000, "damping": 0.006},
+    "Boxwood": {"density": 850, "stiffness": 10000, "damping": 0.01},
+    "Maple": {"density": 700, "stiffness": 9000, "damping": 0.012},
+    "ABS Resin": {"density": 1050, "stiffness": 2300, "damping": 0.02},
+    "Hard Rubber": {"density": 1200, "stiffness": 2700, "damping": 0.025},
+}
+_WOOD_DF = pd.DataFrame(_WOOD_DATA).T
+
+# Only natural woods shrink with humidity cycling and resinification;
+# synthetics get neither the aging model nor the geometry affordance.
+_WOODS = frozenset({"Grenadilla", "Cocobolo", "Boxwood", "Maple"})
+
+
 def render():
     st.subheader("Material System and Aging Simulator")
 
-    # Default wood database
-    wood_data = {
-        "Grenadilla": {"density": 1300, "stiffness": 15000, "damping": 0.005},
-        "Cocobolo": {"density": 1100, "stiffness": 14000, "damping": 0.006},
-        "Boxwood": {"density": 850, "stiffness": 10000, "damping": 0.01},
-        "Maple": {"density": 700, "stiffness": 9000, "damping": 0.012},
-    }
-
     # Display editable table
-    df = pd.DataFrame(wood_data).T
+    df = _WOOD_DF
     st.dataframe(df.style.format({"density": "{:.0f}", "stiffness": "{:.0f}", "damping": "{:.3f}"}))
     logger.debug("Displayed material database.")
 
-    # Select wood
-    wood_choice = st.selectbox("Select Wood", df.index.tolist())
-    props = df.loc[wood_choice].to_dict()
+    # Select material
+    wood_choice = st.selectbox("Select Material", df.index.tolist())
 
     # Aging parameters
     years = st.slider("Years of Aging", 0, 50, 10, step=5)
     seasonal_humidity = st.slider("Average Seasonal Humidity Variation (%)", 0, 40, 15)
 
-    # Simple humidity cycling + resinification model
-    def simulate_aging(density, stiffness, damping, years, humidity_cycle):
+    # Simple humidity cycling + resinification model. Each aged property is
+    # the fresh value times a scalar factor, so the whole table ages in one
+    # (N, 3) * (3,) broadcast instead of calling a per-wood function.
+    def simulate_aging(df, years, humidity_cycle):
         humidity_stress = 1 + 0.005 * humidity_cycle
         resin_effect = 1 - 0.0025 * years
-        aged_density = density * (1 + 0.0008 * years * humidity_stress)
-        aged_stiffness = stiffness * resin_effect * (1 - 0.001 * humidity_cycle)
-        aged_damping = damping * (1 + 0.0009 * years * humidity_stress)
-        return aged_density, aged_stiffness, aged_damping
+        factors = np.array([
+            1 + 0.0008 * years * humidity_stress,            # density
+            resin_effect * (1 - 0.001 * humidity_cycle),     # stiffness
+            1 + 0.0009 * years * humidity_stress,            # damping
+        ])
+        return pd.DataFrame(df.to_numpy() * factors, index=df.index, columns=df.columns)
 
-    aged = simulate_aging(props["density"], props["stiffness"], props["damping"], years, seasonal_humidity)
+    aged_df = simulate_aging(df, years, seasonal_humidity)
+    aged = aged_df.loc[wood_choice]
 
     st.markdown("### Projected Aged Properties:")
-    st.write(f"**Density**: {aged[0]:.1f} kg/m³")
-    st.write(f"**Stiffness**: {aged[1]:.1f} MPa")
-    st.write(f"**Damping**: {aged[2]:.4f}")
+    st.dataframe(aged_df.style.format({"density": "{:.1f}", "stiffness": "{:.1f}", "damping": "{:.4f}"}))
+
+    logger.info(f"Aged properties for {wood_choice} at {years}y, ΔRH={seasonal_humidity}%: {aged.to_dict()}")
+
+    # Geometry effect: wood loses bound water and resinifies over the years,
+    # so the bore contracts slightly. Applied to the whole profile as one
+    # vectorized column update — no per-point Python loop. Synthetics skip
+    # the whole section: no shrinkage math, no zero-effect apply button.
+    st.markdown("### Apply Aging to Geometry")
+    if wood_choice in _WOODS:
+        shrinkage_factor = 0.0002 * years * (1 + 0.01 * seasonal_humidity)
+        profile = st.session_state.get("bore_profile", DEFAULT_BORE_PROFILE)
+        r_max = float(np.max(profile["r"]))
+
+        # One st.dataframe render instead of a st.write per quantity — each
+        # write is its own websocket message to the front-end.
+        summary = pd.DataFrame({
+            "Quantity": ["Shrinkage (%)", "Δ Radius at widest point (mm)", f"{wood_choice} aged density (kg/m³)"],
+            "Value": [shrinkage_factor * 100, shrinkage_factor * r_max, aged["density"]],
+        })
+        st.dataframe(summary.style.format({"Value": "{:.3f}"}), hide_index=True)
 
-    logger.info(f"Aged properties for {wood_choice} at {years}y, ΔRH={seasonal_humidity}%: {aged}")
+        if st.button("Apply Aging to Geometry"):
+            st.session_state.bore_profile = {
+                "x": np.asarray(profile["x"], dtype=np.float64),
+                "r": np.asarray(profile["r"], dtype=np.float64) * (1.0 - shrinkage_factor),
+            }
+            st.success(f"Applied {shrinkage_factor * 100:.2f}% radial shrinkage to the bore profile.")
+            logger.info(f"Applied aging shrinkage {shrinkage_factor:.5f} to bore profile.")
+    else:
+        st.info(f"{wood_choice} is a synthetic material: no shrinkage modeled.")
 
 if __name__ == "__main__":
     render()